@@ -3,33 +3,135 @@ import streamlit as st
 import altair as alt
 import pandas as pd
 import os
+import csv
+import json
+import tempfile
+import html
 import geopandas as gpd
 from shapely.geometry import Point
 import pydeck as pdk
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.cm as cm
-import matplotlib.colors as mcolors
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
 
 # ----------------------------
 # Load Data
 # ----------------------------
+# Summary columns the dashboard reads; everything else is skipped at read time
+KEY_COLUMNS = ("report_type", "report_date", "report_start_date", "report_end_date", "start_date", "end_date")
+METRIC_PREFIXES = ("total_", "unique_", "crime_", "fbi_", "iucr_", "community_area_", "ward_", "district_", "beat_")
+
+def dashboard_columns(names: list) -> list:
+    """Keep the report key columns and prefixed metrics, including their ``prior_`` values."""
+    return [
+        c for c in names
+        if c in KEY_COLUMNS or (c[len("prior_"):] if c.startswith("prior_") else c).startswith(METRIC_PREFIXES)
+    ]
+
+def replace_file_atomically(path: str, write) -> None:
+    """Call ``write`` on a temporary file beside ``path``, then move it into place in one step.
+
+    Readers (including a later cold start after a crash mid-write) never see a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def null_columns_as_float(table: pa.Table) -> pa.Table:
+    """Cast all-empty CSV columns (typed ``null`` by PyArrow) to float64, so pandas sees NaN rather than None."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_null(field.type):
+            table = table.set_column(i, field.with_type(pa.float64()), table.column(i).cast(pa.float64()))
+    return table
+
+CSV_CACHE_KEY = b"csv_cache_options"  # Parquet schema metadata recording how a CSV copy was parsed
+
+def read_csv_with_parquet_cache(file_path: str, select_columns=None, timestamp_columns: tuple = ()) -> pd.DataFrame:
+    """Read a CSV with PyArrow, keeping a ``<file>.csv.parquet`` copy next to it for faster cold starts.
+
+    ``select_columns`` optionally maps the CSV header to the columns worth parsing;
+    ``timestamp_columns`` are parsed straight to timestamps instead of being type-inferred.
+    """
+    # Suffix rather than swap the extension, so a real Parquet file of the same name is never overwritten
+    parquet_path = file_path + ".parquet"
+    include_columns = None
+    if select_columns is not None:
+        with open(file_path, newline="") as f:
+            header = next(csv.reader(f))
+        include_columns = select_columns(header)
+    # The copy only serves callers asking for the same columns and timestamp parsing it was written with
+    cache_key = json.dumps({"columns": include_columns, "timestamps": list(timestamp_columns)}).encode()
+    table = None
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path):
+        try:
+            if (pq.read_schema(parquet_path).metadata or {}).get(CSV_CACHE_KEY) == cache_key:
+                table = null_columns_as_float(pq.read_table(parquet_path))
+        except (pa.ArrowInvalid, OSError):
+            pass  # An unreadable copy is rebuilt from the CSV below
+    if table is None:
+        convert_options = pacsv.ConvertOptions(
+            column_types={col: pa.timestamp("ms") for col in timestamp_columns}
+        )
+        if include_columns is not None:
+            convert_options.include_columns = include_columns
+        # PyArrow parses the CSV (including the date columns) with multiple threads
+        table = null_columns_as_float(pacsv.read_csv(file_path, convert_options=convert_options))
+        tagged = table.replace_schema_metadata({**(table.schema.metadata or {}), CSV_CACHE_KEY: cache_key})
+        try:
+            replace_file_atomically(parquet_path, lambda path: pq.write_table(tagged, path))
+        except OSError:
+            pass  # Read-only deployments simply skip the Parquet cache
+    return table.to_pandas(date_as_object=False)
+
+def downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    """Shrink numeric columns to the narrowest dtype that holds their values."""
+    int_cols = df.select_dtypes(include="integer").columns
+    float_cols = df.select_dtypes(include="float").columns
+    df[int_cols] = df[int_cols].apply(pd.to_numeric, downcast="integer")
+    df[float_cols] = df[float_cols].apply(pd.to_numeric, downcast="float")
+    # Only a handful of report types exist, so store them as categories
+    if "report_type" in df.columns:
+        df["report_type"] = df["report_type"].astype("category")
+    # Consolidate the per-column blocks left behind by the assignments above
+    return df.copy()
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes, then reload fresh data
 def load_data(file_path: str) -> pd.DataFrame:
     """Load the Chicago crime summary data."""
     try:
         if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path, parse_dates=["report_date", "start_date", "end_date"])
+            df = read_csv_with_parquet_cache(
+                file_path,
+                select_columns=dashboard_columns,
+                timestamp_columns=("report_start_date", "report_end_date"),
+            )
         elif file_path.endswith('.parquet'):
-            df = pd.read_parquet(file_path)
+            columns = dashboard_columns(pq.ParquetFile(file_path).schema_arrow.names)
+            df = pq.read_table(file_path, columns=columns).to_pandas(date_as_object=False)
         else:
             st.error("Unsupported file format. Use CSV or Parquet.")
             return pd.DataFrame()
     except FileNotFoundError:
         st.error(f"❌ Data file not found at: {file_path}")
         return pd.DataFrame()
-    return df
+    # Date columns used throughout the dashboard; only parse the ones not already stored as timestamps
+    for source, target in (("report_end_date", "end_date"), ("report_start_date", "start_date")):
+        col = df[source]
+        df[target] = col if pd.api.types.is_datetime64_any_dtype(col) else pd.to_datetime(col)
+    return downcast_numeric(df)
 
 # ----------------------------
 # Load Forecast Data
@@ -39,7 +141,7 @@ def load_forecast_data(file_path: str) -> pd.DataFrame:
     """Load the crime count forecast data."""
     try:
         if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path, parse_dates=["date"])
+            df = read_csv_with_parquet_cache(file_path, timestamp_columns=("date",))
         else:
             st.error("Unsupported file format. Use CSV.")
             return pd.DataFrame()
@@ -59,6 +161,12 @@ def load_choropleth_data(file_path: str) -> pd.DataFrame:
             df = pd.read_parquet(file_path)
             if 'report_end_date' in df.columns:
                 df['report_end_date'] = pd.to_datetime(df['report_end_date'])
+            # Arrow-backed strings compare with vectorized kernels instead of Python objects
+            if 'zip_code' in df.columns:
+                df['zip_code'] = df['zip_code'].astype(str).astype("string[pyarrow]")
+            # Only a handful of report types exist, so store them as categories (integer codes)
+            if 'report_type' in df.columns:
+                df['report_type'] = df['report_type'].astype("category")
         else:
             st.error("Unsupported file format. Use Parquet.")
             return pd.DataFrame()
@@ -67,6 +175,272 @@ def load_choropleth_data(file_path: str) -> pd.DataFrame:
         return pd.DataFrame()
     return df
 
+# ----------------------------
+# Load GeoJSON Boundaries
+# ----------------------------
+@st.cache_resource  # Boundaries are static and read-only, so parse them once per process
+def load_geojson(file_path: str, id_field: str) -> gpd.GeoDataFrame:
+    """Load a GeoJSON boundary file with its id field normalized to strings.
+
+    A ``<file>.geojson.parquet`` GeoParquet copy is kept next to the GeoJSON so later cold starts skip the text parse.
+    """
+    # Suffix rather than swap the extension, so an unrelated Parquet file of the same name is never read or overwritten
+    parquet_path = file_path + ".parquet"
+    gdf = None
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(file_path):
+        try:
+            gdf = gpd.read_parquet(parquet_path)
+        except (ValueError, OSError):  # ArrowInvalid (truncated file) or missing geo metadata
+            pass  # An unreadable copy is rebuilt from the GeoJSON below
+    if gdf is None:
+        gdf = gpd.read_file(file_path)
+        try:
+            replace_file_atomically(parquet_path, lambda path: gdf.to_parquet(path, index=False))
+        except OSError:
+            pass  # Read-only deployments simply skip the GeoParquet cache
+    # One pass to canonical id strings ("017" and 17.0 both become "17")
+    gdf[id_field] = [str(int(v)) for v in gdf[id_field]]
+    return gdf
+
+@st.cache_resource  # Geometry never changes, so its GeoJSON is serialized once per process
+def load_boundary_features(file_path: str, id_field: str) -> list:
+    """Return the GeoJSON features of a boundary file, in GeoDataFrame row order."""
+    # default=str covers the date attributes some boundary files carry
+    return json.loads(load_geojson(file_path, id_field).to_json(default=str))["features"]
+
+def feature_records(values: pd.DataFrame) -> list:
+    """Convert per-polygon values to JSON-ready property dicts (NaN becomes null)."""
+    return values.astype(object).where(values.notna(), None).to_dict("records")
+
+def feature_collection(geojson_path: str, id_field: str, records: list) -> dict:
+    """Add per-polygon properties (one per boundary row) to the cached boundary features.
+
+    The geometry objects are shared with the cache, not copied, so only the properties are rebuilt.
+    """
+    features = load_boundary_features(geojson_path, id_field)
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "geometry": feature["geometry"], "properties": {**feature["properties"], **props}}
+            for feature, props in zip(features, records)
+        ],
+    }
+
+# ----------------------------
+# Build Map Features
+# ----------------------------
+COLOR_COLUMNS = ["color_r", "color_g", "color_b", "color_a"]  # Per-feature RGBA fill, 0-255
+
+# 256-entry RGBA lookup tables (0-255), built once from the matplotlib colormaps
+COLOR_LUTS = {
+    name: (plt.get_cmap(name)(np.arange(256)) * 255).astype(np.uint8)
+    for name in ("YlOrRd", "YlGn", "RdYlGn")
+}
+
+def lut_colors(values: np.ndarray, cmap_name: str, vmin: float, vmax: float, vcenter: float = None) -> np.ndarray:
+    """Map values to rows of a colormap LUT, binned the same way matplotlib bins them.
+
+    With ``vcenter`` the scale is diverging: vmin..vcenter and vcenter..vmax each span half the LUT.
+    """
+    if vcenter is None:
+        scaled = (values - vmin) / (vmax - vmin)
+    else:
+        scaled = np.interp(values, [vmin, vcenter, vmax], [0.0, 0.5, 1.0])
+    idx = np.clip(np.nan_to_num(scaled * 256), 0, 255).astype(int)
+    return COLOR_LUTS[cmap_name][idx]
+
+@st.cache_data(ttl=300)  # One entry per selection; only the small property table is cached and copied
+def zip_feature_properties(geojson_path: str, crime_counts: dict, total_cases: dict) -> list:
+    """Return per-zip crime counts and fill colors, in boundary row order."""
+    gdf = load_geojson(geojson_path, "zip")
+    merged = gdf.assign(
+        zip_code_crime_count=gdf["zip"].map(crime_counts).fillna(0),
+        total_cases=gdf["zip"].map(total_cases)
+    )
+
+    # Create color mapping
+    min_count = merged["zip_code_crime_count"].min()
+    max_count = merged["zip_code_crime_count"].max()
+
+    if min_count == max_count:
+        vmin, vmax = 0, max(1, float(max_count))
+    else:
+        vmin, vmax = float(min_count), float(max_count)
+
+    # Yellow -> Orange -> Red for crime intensity; zips with no crimes get a light gray
+    counts = merged["zip_code_crime_count"].to_numpy(dtype=float)
+    rgba = lut_colors(counts, "YlOrRd", vmin, vmax)
+    empty = np.isnan(counts) | (counts == 0)
+    rgba[empty, :3] = 220
+    rgba[:, 3] = np.where(empty, int(0.5 * 255), int(0.85 * 255))
+    merged[COLOR_COLUMNS] = rgba
+    return feature_records(merged[["zip_code_crime_count", "total_cases", *COLOR_COLUMNS]])
+
+def build_zip_geojson(geojson_path: str, crime_counts: dict, total_cases: dict) -> dict:
+    """Build zip code GeoJSON features with crime counts and fill colors baked in."""
+    return feature_collection(geojson_path, "zip", zip_feature_properties(geojson_path, crime_counts, total_cases))
+
+@st.cache_data(ttl=300)  # One entry per selection; only the small property table is cached and copied
+def geo_feature_properties(geojson_path: str, id_field: str, counts: dict) -> list:
+    """Return per-polygon selected values and fill colors, in boundary row order."""
+    gdf = load_geojson(geojson_path, id_field)
+    merged = gdf.assign(Count=gdf[id_field].map(counts).fillna(0))
+
+    # build RGBA colors per feature (0-255) using a matplotlib colormap
+    min_count, max_count = merged["Count"].min(), merged["Count"].max()
+    if min_count == max_count:
+        vmin, vmax = 0, max(1, float(max_count))
+    else:
+        vmin, vmax = float(min_count), float(max_count)
+
+    # use a diverging colormap when values span negative to positive
+    values = merged["Count"].to_numpy(dtype=float)
+    if (min_count < 0) and (max_count > 0):
+        rgba = lut_colors(values, "RdYlGn", vmin, vmax, vcenter=0.0)  # negatives -> red, positives -> green
+    else:
+        rgba = lut_colors(values, "YlGn", vmin, vmax)
+
+    # missing values get a neutral gray
+    rgba[np.isnan(values), :3] = 200
+    rgba[:, 3] = int(0.75 * 255)
+    merged[COLOR_COLUMNS] = rgba
+    return feature_records(merged[["Count", *COLOR_COLUMNS]])
+
+def build_geo_geojson(geojson_path: str, id_field: str, counts: dict) -> dict:
+    """Build boundary GeoJSON features with the selected values and fill colors baked in."""
+    return feature_collection(geojson_path, id_field, geo_feature_properties(geojson_path, id_field, counts))
+
+@st.cache_data  # Boundaries are static, so each map center is computed once
+def map_midpoint(geojson_path: str, id_field: str) -> tuple:
+    """Return the (lat, lon) map center: the mean of the polygon centroids in a projected CRS."""
+    gdf = load_geojson(geojson_path, id_field)
+    centroid_projected = gdf.to_crs(epsg=3857).geometry.centroid
+    centroid_point = gpd.GeoSeries(
+        [Point(centroid_projected.x.mean(), centroid_projected.y.mean())], crs='EPSG:3857'
+    ).to_crs('EPSG:4326')
+    return centroid_point.y.values[0], centroid_point.x.values[0]
+
+# ----------------------------
+# Metric Grid
+# ----------------------------
+METRIC_GRID_CSS = """
+<style>
+.metric-grid {display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; margin-bottom: 1rem;}
+.metric-grid .label {font-size: 0.875rem; opacity: 0.8;}
+.metric-grid .value {font-size: 2.25rem; line-height: 1.4;}
+</style>
+"""
+
+def metric_grid_html(metrics: list, values) -> str:
+    """Render plain-valued metrics as one three-column HTML grid."""
+    cells = "".join(
+        f'<div><div class="label">{html.escape(m.replace("_", " ").title())}</div>'
+        f'<div class="value">{values[m]:,.0f}</div></div>'
+        for m in metrics
+    )
+    return f'<div class="metric-grid">{cells}</div>'
+
+# ----------------------------
+# Index Data
+# ----------------------------
+@st.cache_resource(ttl=300)  # Read-only, so share one copy instead of re-pickling it each rerun
+def index_report_data(_df: pd.DataFrame, data_version: tuple) -> pd.DataFrame:
+    """Index the summary data by (report_type, end_date) for fast filter lookups.
+
+    The DataFrame is not hashed; ``data_version`` identifies which load it came from.
+    """
+    # set_index splits the blocks it pulls the key columns from; copy() consolidates them again
+    return _df.set_index(["report_type", "end_date"]).sort_index().copy()
+
+@st.cache_resource(ttl=300)
+def report_arrow_table(_df: pd.DataFrame, data_version: tuple) -> pa.Table:
+    """Keep an Arrow copy of the summary data so tabs convert only the rows and columns they use.
+
+    Rows are sorted by end_date, so filtered slices stay in date order for binary-search windowing.
+    """
+    return pa.Table.from_pandas(_df, preserve_index=False).sort_by("end_date")
+
+@st.cache_resource(ttl=300)
+def index_choropleth_data(_choropleth_df: pd.DataFrame, data_version: tuple) -> pd.DataFrame:
+    """Index the zip code rows by (report_type, report_end_date) for fast filter lookups."""
+    if _choropleth_df.empty:
+        return _choropleth_df
+    return _choropleth_df.set_index(["report_type", "report_end_date"]).sort_index()
+
+@st.cache_data(ttl=300)
+def get_sidebar_options(_df: pd.DataFrame, data_version: tuple) -> tuple:
+    """Return the report end dates (newest first) and report types for the sidebar filters."""
+    end_dates = _df["end_date"].sort_values(ascending=False).unique()
+    report_types = sorted(_df["report_type"].unique().tolist())
+    return end_dates, report_types
+
+# ----------------------------
+# Cached Selections
+# ----------------------------
+# Keyed on the sidebar widget values, so repeated selections skip the lookups entirely
+@st.cache_data(ttl=300)
+def get_snapshot(_df_idx: pd.DataFrame, data_version: tuple, report_type: str, end_date: pd.Timestamp) -> pd.DataFrame:
+    """Return the summary row for one report type and end date (empty if there is none)."""
+    return _df_idx.loc[(report_type, end_date):(report_type, end_date)].reset_index()
+
+@st.cache_data(ttl=300)
+def get_choropleth_slice(_choropleth_idx: pd.DataFrame, data_version: tuple, report_type: str, end_date: pd.Timestamp) -> pd.DataFrame:
+    """Return the zip code rows for one report type and end date (empty if there are none)."""
+    # report_type is a categorical level; slicing it with an unknown type raises instead of matching nothing
+    if _choropleth_idx.empty or report_type not in _choropleth_idx.index.levels[0]:
+        return _choropleth_idx.iloc[:0].reset_index()
+    return _choropleth_idx.loc[(report_type, end_date):(report_type, end_date)].reset_index()
+
+@st.cache_data(ttl=300)
+def get_geo_breakdown(_snapshot: pd.Series, data_version: tuple, report_type: str, end_date: pd.Timestamp, geo_type: str) -> pd.DataFrame:
+    """Return the current and prior values for every geography of one layer."""
+    geo_cols = list(GEO_COLUMNS[geo_type])
+    if not geo_cols:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        "Geography": GEO_IDS[geo_type],
+        "Current": _snapshot.reindex(geo_cols).to_numpy(dtype=float),
+        "Prior": _snapshot.reindex([f"{prior_prefix}{c}" for c in geo_cols]).to_numpy(dtype=float),
+    })
+
+@st.cache_data(ttl=300)
+def get_crime_composition(_snapshot: pd.Series, data_version: tuple, report_type: str, end_date: pd.Timestamp, crime_metric_type: str) -> pd.DataFrame:
+    """Return one crime column family's counts, largest first."""
+    # Slice the whole column family out of the snapshot in one go
+    crime_cols = CRIME_COLUMNS[crime_metric_type]
+    crime_df = pd.DataFrame({
+        crime_metric_type: crime_cols,
+        "Count": _snapshot[crime_cols].to_numpy(dtype=float)
+    })
+    return crime_df.sort_values("Count", ascending=False)
+
+@st.cache_data(ttl=300)
+def get_comparison(_snapshot: pd.Series, data_version: tuple, report_type: str, end_date: pd.Timestamp) -> pd.DataFrame:
+    """Return the current vs prior comparison table; values stay numeric so columns sort correctly."""
+    # Compute every pair at once on two aligned value vectors
+    current_vals = _snapshot[CURR_COLS].to_numpy(dtype=float)
+    prior_vals = _snapshot[PRIOR_COLS].to_numpy(dtype=float)
+    delta = current_vals - prior_vals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_change = np.where(prior_vals != 0, delta / prior_vals * 100, np.nan)
+
+    return pd.DataFrame({
+        "Metric": COMPARISON_LABELS,
+        "Current": current_vals,
+        "Prior": prior_vals,
+        "Δ": delta,
+        "% Change": pct_change
+    })
+
+@st.cache_data(ttl=300)
+def get_trend_series(_report_tbl: pa.Table, data_version: tuple, report_type: str, end_date: pd.Timestamp, metric: str) -> pd.DataFrame:
+    """Return one metric's history up to ``end_date``, oldest first, with its 10-period rolling average."""
+    # Filter in Arrow and convert just the two columns the chart needs
+    trend = _report_tbl.filter(
+        (pc.field("report_type") == report_type) & (pc.field("end_date") <= end_date)
+    ).select(["end_date", metric]).to_pandas()
+    return trend.assign(rolling_avg=trend[metric].rolling(10).mean())
+
 # ----------------------------
 # File Path
 # ----------------------------
@@ -77,13 +451,16 @@ with st.spinner("Loading data..."):
     df = load_data(file_path)
     forecast_df = load_forecast_data(forecast_file_path)
     choropleth_df = load_choropleth_data(choropleth_file_path)
-df["end_date"] = pd.to_datetime(df["report_end_date"])
-df["start_date"] = pd.to_datetime(df["report_start_date"])
-df["report_date"] = df["report_date"]
 
 if df.empty:
     st.stop()
 
+data_version = (file_path, df.shape, df["end_date"].max())
+df_idx = index_report_data(df, data_version)
+report_tbl = report_arrow_table(df, data_version)
+choropleth_version = (choropleth_file_path, choropleth_df.shape)
+choropleth_idx = index_choropleth_data(choropleth_df, choropleth_version)
+
 # ----------------------------
 # Constants for Metrics
 # ----------------------------
@@ -94,10 +471,45 @@ CRIME_TYPE_METRICS = [c for c in df.columns if c.startswith("crime_") or c.start
 CRIME_TYPE_METRICS += [c for c in df.columns if c.startswith("iucr_")]
 GEO_METRICS = [c for c in df.columns if c.startswith("community_area_") or c.startswith("ward_") or c.startswith("district_") or c.startswith("beat_")]
 
+# Crime composition column families, keyed by the "Select Crime Metric Type" options
+CRIME_COLUMNS = {
+    "Crime Type": [c for c in CRIME_TYPE_METRICS if c.startswith("crime_")],
+    "FBI Code": [c for c in CRIME_TYPE_METRICS if c.startswith("fbi_")],
+    "IUCR": [c for c in CRIME_TYPE_METRICS if c.startswith("iucr_")],
+}
+
 # Comparison pairs using a prior prefix
 prior_prefix = "prior_"
 _candidate_metrics = CASE_METRICS + UNIQUE_METRICS + CRIME_TYPE_METRICS
 COMPARISON_PAIRS = [(m, f"{prior_prefix}{m}") for m in _candidate_metrics if f"{prior_prefix}{m}" in df.columns]
+# Aligned current/prior column lists and row labels for the comparison table
+CURR_COLS = [curr for curr, _ in COMPARISON_PAIRS]
+PRIOR_COLS = [prev for _, prev in COMPARISON_PAIRS]
+COMPARISON_LABELS = [curr.replace("_", " ").title() for curr in CURR_COLS]
+# Display formats for the comparison table, applied by the frontend instead of a Styler on every rerun
+COMPARISON_COLUMN_CONFIG = {
+    "Current": st.column_config.NumberColumn(format="%,.0f"),
+    "Prior": st.column_config.NumberColumn(format="%,.0f"),
+    "Δ": st.column_config.NumberColumn(format="%,.0f"),
+    "% Change": st.column_config.NumberColumn(format="%,.2f%%"),
+}
+
+# Geographic layers: column prefix, GeoJSON boundary file and the boundary id field
+GEO_LAYERS = {
+    "District": ("district_", "data/geojson/chicago_districts.geojson", "dist_num"),
+    "Ward": ("ward_", "data/geojson/chicago_wards.geojson", "ward_id"),
+    "Community Area": ("community_area_", "data/geojson/chicago_community_areas.geojson", "area_numbe"),
+    "Beat": ("beat_", "data/geojson/chicago_beats.geojson", "beat_num"),
+}
+# Per-layer metric columns and their geography ids (as polygon join-key strings), resolved once from the column names
+GEO_COLUMNS = {
+    geo_type: tuple(c for c in GEO_METRICS if c.startswith(prefix) and c[len(prefix):].isdigit())
+    for geo_type, (prefix, _, _) in GEO_LAYERS.items()
+}
+GEO_IDS = {
+    geo_type: tuple(str(int(c[len(GEO_LAYERS[geo_type][0]):])) for c in cols)
+    for geo_type, cols in GEO_COLUMNS.items()
+}
 
 # ----------------------------
 # Dashboard Title
@@ -109,26 +521,17 @@ st.title("📊 Chicago Police Report Dashboard")
 # ----------------------------
 st.sidebar.header("Filters")
 
-end_dates = df["end_date"].sort_values(ascending=False).unique()
+end_dates, report_types = get_sidebar_options(df, data_version)
 selected_end_date = st.sidebar.selectbox("Select Report End Date", end_dates, index=0)
 selected_end_date = pd.Timestamp(selected_end_date)
-report_types = ['R12', 'YTD']
 selected_report_type = st.sidebar.selectbox(
     "Select Report Type",
     report_types,
     index=0
 )
 
-# Apply filters
-filtered_df = df[
-    (df["report_type"] == selected_report_type) &
-    (df["end_date"] == selected_end_date)
-]
-
-trend_df = df[
-    (df["report_type"] == selected_report_type) &
-    (df["end_date"] <= selected_end_date)
-]
+# Apply filters (sorted index lookups instead of full-column scans)
+filtered_df = get_snapshot(df_idx, data_version, selected_report_type, selected_end_date)
 
 # ----------------------------
 # Reporting Period
@@ -146,428 +549,362 @@ if not filtered_df.empty:
 # ----------------------------
 st.header("📌 Dashboard Views")
 
+# Widgets inside a closed tab are not rendered, and Streamlit drops the state of widgets missing
+# from a run; re-assigning their values keeps each tab's selections while another tab is open
+TAB_WIDGET_KEYS = ("crime_metric_type_select", "geo_type_select", "geo_compare_select", "trend_window_select", "trend_metric_select")
+st.session_state.setdefault("trend_window_select", 12)  # Default trend window; set here so the slider has no competing default
+for key in TAB_WIDGET_KEYS:
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+
+# on_change="rerun" makes tabs lazy: only the selected tab's body runs (checked via tab.open)
 tab_overview, tab_crimes, tab_geo, tab_trends, tab_comparison, tab_forecasts = st.tabs(
-    ["📊 Overview", "🚨 Crime Composition", "🏙️ Geographic Breakdown", "📈 Trends", "📉 Comparison", "📈 Forecasts"]
+    ["📊 Overview", "🚨 Crime Composition", "🏙️ Geographic Breakdown", "📈 Trends", "📉 Comparison", "📈 Forecasts"],
+    key="active_tab",
+    on_change="rerun"
 )
 
 # --- Overview Tab ---
 with tab_overview:
-    if not filtered_df.empty:
-        st.subheader("Summary Metrics")
-
-        # Case counts
-        st.subheader("📊 Case Counts")
-        for i in range(0, len(CASE_METRICS), 3):
-            cols = st.columns(3)
-            for c, m in zip(cols, CASE_METRICS[i:i+3]):
-                c.metric(label=m.replace("_", " ").title(), value=f"{snapshot[m]:,.0f}")
-
-        # Unique categories
-        st.subheader("🔑 Unique Categories")
-        cols = st.columns(min(3, len(UNIQUE_METRICS)))
-        for c, m in zip(cols, UNIQUE_METRICS):
-            c.metric(label=m.replace("_", " ").title(), value=f"{snapshot[m]:,.0f}")
-
-        # Crime type metrics (show first 6 as example)
-        st.subheader("🚨 Crime Type Metrics")
-        cols = st.columns(min(3, len(CRIME_TYPE_METRICS)))
-        for i in range(0, min(6, len(CRIME_TYPE_METRICS)), 3):
+    if tab_overview.open:
+        if not filtered_df.empty:
+            st.subheader("Summary Metrics")
+
+            # Case counts and unique categories: one markdown element each instead of one per metric
+            st.markdown(METRIC_GRID_CSS, unsafe_allow_html=True)
+            st.subheader("📊 Case Counts")
+            st.markdown(metric_grid_html(CASE_METRICS, snapshot), unsafe_allow_html=True)
+
+            # Unique categories (first row only, as before)
+            st.subheader("🔑 Unique Categories")
+            st.markdown(metric_grid_html(UNIQUE_METRICS[:3], snapshot), unsafe_allow_html=True)
+
+            # Crime type metrics (show first 6 as example)
+            st.subheader("🚨 Crime Type Metrics")
+            # One set of columns; metric i lands in row i // 3, column i % 3
             cols = st.columns(3)
-            for c, m in zip(cols, CRIME_TYPE_METRICS[i:i+3]):
-                c.metric(label=m.replace("_", " ").title(), value=f"{snapshot[m]:,.0f}")
+            for i, m in enumerate(CRIME_TYPE_METRICS[:6]):
+                cols[i % 3].metric(label=m.replace("_", " ").title(), value=f"{snapshot[m]:,.0f}")
 # --- Trends Tab ---
 with tab_trends:
-    st.subheader("📈 Trends Over Time")
-    if not trend_df.empty:
-        months_back = st.slider("Select Trend Window (Months)", 6, 72, 12)
-        trend_window = trend_df[
-            trend_df['end_date'] >= pd.to_datetime(selected_end_date) - pd.DateOffset(months=months_back)
-        ].sort_values("end_date").copy()
-
-        metric_choice = st.selectbox("Select Metric", CASE_METRICS, index=0)
-        trend_window = trend_window.assign(rolling_avg=trend_window[metric_choice].rolling(10).mean())
-
-        chart = alt.Chart(trend_window).mark_line(point=True).encode(
-            x="end_date:T",
-            y=alt.Y(f"{metric_choice}:Q", title=metric_choice.replace("_", " ").title()),
-            color=alt.value("#007BFF"),
-            tooltip=["end_date", metric_choice]
-        )
-        avg_line = alt.Chart(trend_window).mark_line(strokeDash=[5,5], color="red").encode(
-            x="end_date:T",
-            y="rolling_avg:Q"
-        )
-        st.altair_chart(chart + avg_line, width='stretch')
+    if tab_trends.open:
+        st.subheader("📈 Trends Over Time")
+        months_back = st.slider("Select Trend Window (Months)", 6, 72, key="trend_window_select")
+        metric_choice = st.selectbox("Select Metric", CASE_METRICS, index=0, key="trend_metric_select")
+        # Full history with the rolling average, cached per metric; the slider only slices it
+        trend_df = get_trend_series(report_tbl, data_version, selected_report_type, selected_end_date, metric_choice)
+        if not trend_df.empty:
+            # trend_df is already in date order, so the window start is a binary search
+            window_start = trend_df["end_date"].searchsorted(selected_end_date - pd.DateOffset(months=months_back))
+            trend_window = trend_df.iloc[window_start:]
+
+            # Plain Vega-Lite spec: skips Altair's schema validation on every rerun
+            trend_spec = {
+                "layer": [
+                    {
+                        "mark": {"type": "line", "point": True},
+                        "encoding": {
+                            "x": {"field": "end_date", "type": "temporal"},
+                            "y": {
+                                "field": metric_choice,
+                                "type": "quantitative",
+                                "title": metric_choice.replace("_", " ").title()
+                            },
+                            "color": {"value": "#007BFF"},
+                            "tooltip": [
+                                {"field": "end_date", "type": "temporal"},
+                                {"field": metric_choice, "type": "quantitative"}
+                            ]
+                        }
+                    },
+                    {
+                        "mark": {"type": "line", "strokeDash": [5, 5], "color": "red"},
+                        "encoding": {
+                            "x": {"field": "end_date", "type": "temporal"},
+                            "y": {"field": "rolling_avg", "type": "quantitative"}
+                        }
+                    }
+                ]
+            }
+            st.vega_lite_chart(trend_window[["end_date", metric_choice, "rolling_avg"]], trend_spec, width='stretch')
 
 # --- Crime Composition Tab ---
 with tab_crimes:
-    st.subheader("🚨 Crime Composition")
-    if not filtered_df.empty:
-        # Dropdown to select metric type
-        crime_metric_type = st.selectbox(
-            "Select Crime Metric Type",
-            ("Crime Type", "FBI Code", "IUCR"),
-            key="crime_metric_type_select"
-        )
+    if tab_crimes.open:
+        st.subheader("🚨 Crime Composition")
+        if not filtered_df.empty:
+            # Dropdown to select metric type
+            crime_metric_type = st.selectbox(
+                "Select Crime Metric Type",
+                ("Crime Type", "FBI Code", "IUCR"),
+                key="crime_metric_type_select"
+            )
 
-        if crime_metric_type == "Crime Type":
-            crime_cols = [col for col in CRIME_TYPE_METRICS if col.startswith("crime_")]
-        elif crime_metric_type == "FBI Code":
-            crime_cols = [col for col in CRIME_TYPE_METRICS if col.startswith("fbi_")]
-        elif crime_metric_type == "IUCR":
-            crime_cols = [col for col in CRIME_TYPE_METRICS if col.startswith("iucr_")]
-
-        crime_data = {col: snapshot[col] for col in crime_cols if col in snapshot}
-        crime_df = pd.DataFrame(list(crime_data.items()), columns=[crime_metric_type, "Count"])
-        crime_df = crime_df.sort_values("Count", ascending=False)
-        st.dataframe(crime_df)
-        chart = alt.Chart(crime_df).mark_bar().encode(
-            x=alt.X("Count:Q", sort="-y"),
-            y=alt.Y(f"{crime_metric_type}:N", sort="-x"),
-            tooltip=[crime_metric_type, "Count"]
-        ).properties(width=600, height=400)
-        st.altair_chart(chart, width='stretch')
-    else:
-        st.info("No crime composition data available for this report.")
+            crime_df = get_crime_composition(
+                snapshot, data_version, selected_report_type, selected_end_date, crime_metric_type
+            )
+            st.dataframe(crime_df)
+            crime_spec = {
+                "mark": "bar",
+                "height": 400,
+                "encoding": {
+                    "x": {"field": "Count", "type": "quantitative", "sort": "-y"},
+                    "y": {"field": crime_metric_type, "type": "nominal", "sort": "-x"},
+                    "tooltip": [
+                        {"field": crime_metric_type, "type": "nominal"},
+                        {"field": "Count", "type": "quantitative"}
+                    ]
+                }
+            }
+            st.vega_lite_chart(crime_df, crime_spec, width='stretch')
+        else:
+            st.info("No crime composition data available for this report.")
 
 # --- Geographic Breakdown Tab ---
 with tab_geo:
-    st.subheader("🏙️ Geographic Breakdown")
-    if not filtered_df.empty:
-        geo_type = st.selectbox(
-            "Select Geographic Type",
-            ("District", "Ward", "Community Area", "Beat", "Zip Code"),
-            key="geo_type_select"
-        )
+    if tab_geo.open:
+        st.subheader("🏙️ Geographic Breakdown")
+        if not filtered_df.empty:
+            geo_type = st.selectbox(
+                "Select Geographic Type",
+                ("District", "Ward", "Community Area", "Beat", "Zip Code"),
+                key="geo_type_select"
+            )
 
-        # Handle Zip Code separately (uses choropleth data)
-        if geo_type == "Zip Code":
-            if not choropleth_df.empty:
-                # Filter choropleth data to match selected filters
-                choropleth_filtered = choropleth_df[
-                    (choropleth_df["report_type"] == selected_report_type) &
-                    (choropleth_df["report_end_date"] == selected_end_date)
-                ]
+            # Handle Zip Code separately (uses choropleth data)
+            if geo_type == "Zip Code":
+                if not choropleth_df.empty:
+                    # Filter choropleth data to match selected filters
+                    choropleth_filtered = get_choropleth_slice(
+                        choropleth_idx, choropleth_version, selected_report_type, selected_end_date
+                    )
                 
-                if not choropleth_filtered.empty:
-                    # Load geojson
-                    geojson_path = "data/geojson/chicago_zip_codes.geojson"
-                    if os.path.exists(geojson_path):
-                        gdf = gpd.read_file(geojson_path)
-                        
-                        # Prepare data for merge
-                        choropleth_filtered["zip_code"] = choropleth_filtered["zip_code"].astype(str)
-                        gdf["zip"] = gdf["zip"].astype(str)
+                    if not choropleth_filtered.empty:
+                        geojson_path = "data/geojson/chicago_zip_codes.geojson"
+                        if os.path.exists(geojson_path):
+                            # Counts per zip; the colored features are cached per selection
+                            zip_keys = choropleth_filtered["zip_code"]
+                            crime_count_map = dict(zip(zip_keys, choropleth_filtered["zip_code_crime_count"]))
+                            total_cases_map = dict(zip(zip_keys, choropleth_filtered["total_cases"]))
+                            geojson_dict = build_zip_geojson(geojson_path, crime_count_map, total_cases_map)
                         
-                        # Merge choropleth data with geojson
-                        merged = gdf.merge(
-                            choropleth_filtered[["zip_code", "zip_code_crime_count", "total_cases"]],
-                            left_on="zip",
-                            right_on="zip_code",
-                            how="left"
-                        )
-                        merged["zip_code_crime_count"] = merged["zip_code_crime_count"].fillna(0)
+                            # Create pydeck layer
+                            layer = pdk.Layer(
+                                "GeoJsonLayer",
+                                data=geojson_dict,
+                                get_fill_color="[properties.color_r, properties.color_g, properties.color_b, properties.color_a]",
+                                pickable=True,
+                                auto_highlight=True,
+                                get_line_color=[0, 0, 0, 100],
+                                line_width_min_pixels=1,
+                                filled=True,
+                                stroked=True,
+                                opacity=0.85,
+                            )
                         
-                        # Create color mapping
-                        min_count = merged["zip_code_crime_count"].min()
-                        max_count = merged["zip_code_crime_count"].max()
+                            # Calculate map center
+                            midpoint = map_midpoint(geojson_path, "zip")
                         
-                        if min_count == max_count:
-                            vmin, vmax = 0, max(1, float(max_count))
-                        else:
-                            vmin, vmax = float(min_count), float(max_count)
+                            view_state = pdk.ViewState(
+                                latitude=midpoint[0],
+                                longitude=midpoint[1],
+                                zoom=10,
+                                pitch=0,
+                            )
                         
-                        norm = mcolors.Normalize(vmin=vmin, vmax=vmax)
-                        cmap = plt.get_cmap("YlOrRd")  # Yellow -> Orange -> Red for crime intensity
+                            st.pydeck_chart(
+                                pdk.Deck(
+                                    layers=[layer],
+                                    initial_view_state=view_state,
+                                    tooltip={"text": "Zip Code: {zip}\nCrimes: {zip_code_crime_count}"}
+                                )
+                            )
                         
-                        def count_to_rgba(val):
-                            """Convert crime count to RGBA color."""
-                            if pd.isna(val) or val == 0:
-                                alpha = 0.5
-                                return [220, 220, 220, int(alpha * 255)]
-                            r, g, b, a = cmap(norm(val))
-                            alpha = 0.85
-                            return [int(r * 255), int(g * 255), int(b * 255), int(alpha * 255)]
+                            # Show top zip codes by crime count
+                            st.subheader("📊 Top Zip Codes by Crime Count")
+                            zip_summary = choropleth_filtered.nlargest(20, "zip_code_crime_count")[
+                                ["zip_code", "zip_code_crime_count"]
+                            ]
                         
-                        merged["fill_color"] = merged["zip_code_crime_count"].apply(count_to_rgba)
+                            zip_spec = {
+                                "mark": "bar",
+                                "height": 600,
+                                "encoding": {
+                                    "x": {"field": "zip_code_crime_count", "type": "quantitative", "title": "Crime Count"},
+                                    "y": {"field": "zip_code", "type": "nominal", "sort": "-x", "title": "Zip Code"},
+                                    "tooltip": [
+                                        {"field": "zip_code", "type": "nominal"},
+                                        {"field": "zip_code_crime_count", "type": "quantitative"}
+                                    ],
+                                    "color": {
+                                        "field": "zip_code_crime_count",
+                                        "type": "quantitative",
+                                        "scale": {"scheme": "reds"}
+                                    }
+                                }
+                            }
+                            st.vega_lite_chart(zip_summary, zip_spec, width='stretch')
                         
-                        # Create pydeck layer
-                        geojson_dict = merged.__geo_interface__
+                        else:
+                            st.warning(f"GeoJSON file not found: {geojson_path}")
+                    else:
+                        st.info("No zip code data available for the selected filters.")
+                else:
+                    st.info("Choropleth data not available. Please ensure zip code enrichment is complete.")
+        
+            # Handle other geographic types
+            else:
+                _, geojson_path, id_field = GEO_LAYERS[geo_type]
+
+                # Comparison option
+                compare_option = st.selectbox(
+                    "Compare (value to visualize)",
+                    ("Current", "Prior", "Difference (Current - Prior)", "% Change (Current vs Prior)"),
+                    key="geo_compare_select"
+                )
+
+                # Build geo dataframe with Current and Prior columns
+                geo_df = get_geo_breakdown(snapshot, data_version, selected_report_type, selected_end_date, geo_type)
+
+                if geo_df.empty:
+                    st.info("No geographic data available for the selected type.")
+                else:
+
+                    # Compute the Count column based on selection
+                    current = geo_df["Current"].to_numpy()
+                    prior = geo_df["Prior"].to_numpy()
+                    if compare_option == "Current":
+                        geo_df["Count"] = current
+                    elif compare_option == "Prior":
+                        geo_df["Count"] = prior
+                    elif compare_option == "Difference (Current - Prior)":
+                        geo_df["Count"] = current - prior
+                    else:  # % Change
+                        with np.errstate(divide="ignore", invalid="ignore"):
+                            geo_df["Count"] = np.where(
+                                ~np.isnan(prior) & (prior != 0),
+                                (current - prior) / prior * 100,
+                                np.nan
+                            )
+
+                    geo_df = geo_df.sort_values("Count", ascending=False)
+
+                    # --- Map Visualization ---
+                    if os.path.exists(geojson_path):
+                        # Values per polygon id; the colored features are cached per selection
+                        count_map = dict(zip(geo_df["Geography"], geo_df["Count"]))
+                        geojson_dict = build_geo_geojson(geojson_path, id_field, count_map)
+
                         layer = pdk.Layer(
                             "GeoJsonLayer",
                             data=geojson_dict,
-                            get_fill_color="properties.fill_color",
+                            get_fill_color="[properties.color_r, properties.color_g, properties.color_b, properties.color_a]",
                             pickable=True,
                             auto_highlight=True,
-                            get_line_color=[0, 0, 0, 100],
+                            get_line_color=[0, 0, 0, 80],
                             line_width_min_pixels=1,
                             filled=True,
                             stroked=True,
-                            opacity=0.85,
+                            extruded=False,
+                            opacity=0.8,
                         )
-                        
-                        # Calculate map center
-                        merged_projected = merged.to_crs(epsg=3857)
-                        centroid_projected = merged_projected.geometry.centroid
-                        centroid_mean_x = centroid_projected.x.mean()
-                        centroid_mean_y = centroid_projected.y.mean()
-                        centroid_point = gpd.GeoSeries([Point(centroid_mean_x, centroid_mean_y)], crs='EPSG:3857').to_crs('EPSG:4326')
-                        midpoint = (centroid_point.y.values[0], centroid_point.x.values[0])
-                        
+                        # Map center from the cached projected centroids
+                        midpoint = map_midpoint(geojson_path, id_field)
                         view_state = pdk.ViewState(
                             latitude=midpoint[0],
                             longitude=midpoint[1],
-                            zoom=10,
+                            zoom=9,
                             pitch=0,
                         )
-                        
                         st.pydeck_chart(
                             pdk.Deck(
                                 layers=[layer],
                                 initial_view_state=view_state,
-                                tooltip={"text": "Zip Code: {zip}\nCrimes: {zip_code_crime_count}"}
+                                tooltip={"text": f"{geo_type}: {{{id_field}}}\nValue: {{Count}}"}
                             )
                         )
-                        
-                        # Show top zip codes by crime count
-                        st.subheader("📊 Top Zip Codes by Crime Count")
-                        zip_summary = choropleth_filtered[["zip_code", "zip_code_crime_count"]].sort_values(
-                            "zip_code_crime_count", ascending=False
-                        ).head(20)
-                        
-                        chart = alt.Chart(zip_summary).mark_bar().encode(
-                            x=alt.X("zip_code_crime_count:Q", title="Crime Count"),
-                            y=alt.Y("zip_code:N", sort="-x", title="Zip Code"),
-                            tooltip=["zip_code", "zip_code_crime_count"],
-                            color=alt.Color("zip_code_crime_count:Q", scale=alt.Scale(scheme="reds"))
-                        ).properties(width=600, height=600)
-                        st.altair_chart(chart, use_container_width=True)
-                        
+
+                        geo_spec = {
+                            "mark": "bar",
+                            "height": 400,
+                            "encoding": {
+                                "x": {"field": "Count", "type": "quantitative", "sort": "-y"},
+                                "y": {"field": "Geography", "type": "nominal", "sort": "-x"},
+                                "tooltip": [
+                                    {"field": "Geography", "type": "nominal"},
+                                    {"field": "Count", "type": "quantitative"}
+                                ]
+                            }
+                        }
+                        st.vega_lite_chart(geo_df, geo_spec, width='stretch')
                     else:
                         st.warning(f"GeoJSON file not found: {geojson_path}")
-                else:
-                    st.info("No zip code data available for the selected filters.")
-            else:
-                st.info("Choropleth data not available. Please ensure zip code enrichment is complete.")
-        
-        # Handle other geographic types
         else:
-            if geo_type == "Ward":
-                geo_cols = [col for col in GEO_METRICS if col.startswith("ward_")]
-                geojson_path = "data/geojson/chicago_wards.geojson"
-                id_field = "ward_id"
-            elif geo_type == "District":
-                geo_cols = [col for col in GEO_METRICS if col.startswith("district_")]
-                geojson_path = "data/geojson/chicago_districts.geojson"
-                id_field = "dist_num"
-            elif geo_type == "Community Area":
-                geo_cols = [col for col in GEO_METRICS if col.startswith("community_area_")]
-                geojson_path = "data/geojson/chicago_community_areas.geojson"
-                id_field = "area_numbe"
-            else:  # Beat
-                geo_cols = [col for col in GEO_METRICS if col.startswith("beat_")]
-                geojson_path = "data/geojson/chicago_beats.geojson"
-                id_field = "beat_num"
-
-            # Comparison option
-            compare_option = st.selectbox(
-                "Compare (value to visualize)",
-                ("Current", "Prior", "Difference (Current - Prior)", "% Change (Current vs Prior)"),
-                key="geo_compare_select"
-            )
-
-            # Build geo dataframe with Current and Prior columns
-            geo_rows = []
-            for col in geo_cols:
-                try:
-                    geo_id = int(col.split("_")[-1])
-                except Exception:
-                    continue
-                current_val = snapshot.get(col, np.nan)
-                prior_val = snapshot.get(f"{prior_prefix}{col}", np.nan)
-                geo_rows.append({"Geography": geo_id, "Current": current_val, "Prior": prior_val})
-
-            if len(geo_rows) == 0:
-                st.info("No geographic data available for the selected type.")
-            else:
-                geo_df = pd.DataFrame(geo_rows)
-
-                # Compute the Count column based on selection
-                if compare_option == "Current":
-                    geo_df["Count"] = geo_df["Current"]
-                elif compare_option == "Prior":
-                    geo_df["Count"] = geo_df["Prior"]
-                elif compare_option == "Difference (Current - Prior)":
-                    geo_df["Count"] = geo_df["Current"] - geo_df["Prior"]
-                else:  # % Change
-                    geo_df["Count"] = np.where(
-                        (geo_df["Prior"].notna()) & (geo_df["Prior"] != 0),
-                        (geo_df["Current"] - geo_df["Prior"]) / geo_df["Prior"] * 100,
-                        np.nan
-                    )
-
-                geo_df["Geography"] = geo_df["Geography"].astype(int).astype(str)
-                geo_df = geo_df.sort_values("Count", ascending=False)
-
-                # --- Map Visualization ---
-                if os.path.exists(geojson_path):
-                    gdf = gpd.read_file(geojson_path)
-                    gdf[id_field] = gdf[id_field].astype(int).astype(str)
-                    merged = gdf.merge(geo_df, left_on=id_field, right_on="Geography", how="left", indicator=True)
-                    merged["Count"] = merged["Count"].fillna(0)
-
-                    # build RGBA colors per feature (0-255) using a matplotlib colormap
-                    min_count, max_count = merged["Count"].min(), merged["Count"].max()
-                    if min_count == max_count:
-                        vmin, vmax = 0, max(1, float(max_count))
-                    else:
-                        vmin, vmax = float(min_count), float(max_count)
-
-                    # use a diverging norm / colormap when values span negative to positive
-                    if (min_count < 0) and (max_count > 0):
-                        norm = mcolors.TwoSlopeNorm(vmin=vmin, vcenter=0.0, vmax=vmax)
-                        cmap = plt.get_cmap("RdYlGn")  # negatives -> red, positives -> green
-                    else:
-                        norm = mcolors.Normalize(vmin=vmin, vmax=vmax)
-                        cmap = plt.get_cmap("YlGn")
-
-                    def count_to_rgba(val):
-                        " handle missing values with a neutral gray"
-                        
-                        if pd.isna(val):
-                            alpha = 0.75
-                            return [200, 200, 200, int(alpha * 255)]
-                        r, g, b, a = cmap(norm(val))
-                        alpha = 0.75
-                        return [int(r * 255), int(g * 255), int(b * 255), int(alpha * 255)]
-
-                    merged["fill_color"] = merged["Count"].apply(count_to_rgba)
-
-                    geojson_dict = merged.__geo_interface__
-
-                    layer = pdk.Layer(
-                        "GeoJsonLayer",
-                        data=geojson_dict,
-                        get_fill_color="properties.fill_color",
-                        pickable=True,
-                        auto_highlight=True,
-                        get_line_color=[0, 0, 0, 80],
-                        line_width_min_pixels=1,
-                        filled=True,
-                        stroked=True,
-                        extruded=False,
-                        opacity=0.8,
-                    )
-                    # Reproject to projected CRS for accurate centroid calculation
-                    merged_projected = merged.to_crs(epsg=3857)
-                    centroid_projected = merged_projected.geometry.centroid
-                    centroid_mean_x = centroid_projected.x.mean()
-                    centroid_mean_y = centroid_projected.y.mean()
-                    # Convert centroid back to lat/lon
-                    centroid_point = gpd.GeoSeries([Point(centroid_mean_x, centroid_mean_y)], crs='EPSG:3857').to_crs('EPSG:4326')
-                    midpoint = (centroid_point.y.values[0], centroid_point.x.values[0])
-                    view_state = pdk.ViewState(
-                        latitude=midpoint[0],
-                        longitude=midpoint[1],
-                        zoom=9,
-                        pitch=0,
-                    )
-                    st.pydeck_chart(
-                        pdk.Deck(
-                            layers=[layer],
-                            initial_view_state=view_state,
-                            tooltip={"text": f"{geo_type}: {{{id_field}}}\nValue: {{Count}}"}
-                        )
-                    )
-
-                    chart = alt.Chart(geo_df).mark_bar().encode(
-                        x=alt.X("Count:Q", sort="-y"),
-                        y=alt.Y("Geography:N", sort="-x"),
-                        tooltip=["Geography", "Count"]
-                    ).properties(width=600, height=400)
-                    st.altair_chart(chart, width='stretch')
-                else:
-                    st.warning(f"GeoJSON file not found: {geojson_path}")
-    else:
-        st.info("No geographic breakdown data available for this report.")
+            st.info("No geographic breakdown data available for this report.")
 
 # --- Comparison Tab ---
 with tab_comparison:
-    st.subheader("📉 Prior Period Comparison")
-    if not filtered_df.empty:
-        comparison = []
-        for curr, prev in COMPARISON_PAIRS:
-            current_val = snapshot[curr]
-            prior_val = snapshot[prev]
-            delta = current_val - prior_val
-            pct_change = (delta / prior_val * 100) if pd.notna(prior_val) and prior_val != 0 else np.nan
-            comparison.append({
-                "Metric": curr.replace("_", " ").title(),
-                "Current": current_val,
-                "Prior": prior_val,
-                "Δ": delta,
-                "% Change": pct_change
-            })
-
-        comp_df = pd.DataFrame(comparison)
-        st.dataframe(comp_df.style.format({
-            "Current": "{:,.0f}",
-            "Prior": "{:,.0f}",
-            "Δ": "{:,.0f}",
-            "% Change": "{:,.2f}%"
-        }))
+    if tab_comparison.open:
+        st.subheader("📉 Prior Period Comparison")
+        if not filtered_df.empty:
+            comp_df = get_comparison(snapshot, data_version, selected_report_type, selected_end_date)
+            st.dataframe(comp_df, column_config=COMPARISON_COLUMN_CONFIG)
 
 # --- Forecasts Tab ---
 with tab_forecasts:
-    st.subheader("📈 Monthly Crime Trends with Forecasts")
-
-    if not forecast_df.empty:
-        st.subheader("Crime Count Forecasts")
-
-        # Select the metric to visualize
-        metric_options = ["actual_crime_count"] + [
-            col for col in forecast_df.columns if col.startswith("predicted_crime_count_")
-        ]
-
-        # Replace negative values with NaN
-        forecast_df[metric_options[1:]] = forecast_df[metric_options[1:]].map(lambda x: x if x >= 0 else np.nan)
-
-        # Filter valid columns (exclude columns with all NaN values)
-        valid_columns = ["date", "actual_crime_count"] + [
-            col for col in metric_options[1:] if not forecast_df[col].isna().all()
-        ]
-        metric_data = forecast_df[valid_columns].copy()
-
-        # Ensure the date column is a datetime type
-        metric_data["date"] = pd.to_datetime(metric_data["date"])
-
-        if not metric_data.empty:
-            # Melt the data for easier plotting with Altair
-            metric_data = metric_data.melt(id_vars=["date"], var_name="Model", value_name="Crime Count")
-
-            # Calculate the y-axis maximum value (10x the max of actual_crime_count)
-            y_max = metric_data[metric_data["Model"] == "actual_crime_count"]["Crime Count"].max() * 1.3
-            if pd.isna(y_max) or y_max == 0:
-                y_max = 1  # Set a default value if y_max is invalid
-
-
-            # Create Altair chart
-            chart = alt.Chart(metric_data).mark_line(point=True).encode(
-                x=alt.X("date:T", title="Date"),
-                y=alt.Y(
-                    "Crime Count:Q",
-                    title="Crime Count"
-                    , scale=alt.Scale(domain=[-50, y_max], clamp=True)  # Set y-axis range
-                ),
-                color=alt.Color("Model:N", title="Model"),  # Dynamically assign colors to each model
-                tooltip=["date:T", "Model:N", "Crime Count:Q"]
-            ).properties(title="Actual and Forecasted Crime Counts")
-
-            st.altair_chart(chart, width='stretch')
+    if tab_forecasts.open:
+        st.subheader("📈 Monthly Crime Trends with Forecasts")
+
+        if not forecast_df.empty:
+            st.subheader("Crime Count Forecasts")
+
+            # Select the metric to visualize
+            metric_options = ["actual_crime_count"] + [
+                col for col in forecast_df.columns if col.startswith("predicted_crime_count_")
+            ]
+
+            # Replace negative values with NaN
+            forecast_df[metric_options[1:]] = forecast_df[metric_options[1:]].map(lambda x: x if x >= 0 else np.nan)
+
+            # Filter valid columns (exclude columns with all NaN values)
+            valid_columns = ["date", "actual_crime_count"] + [
+                col for col in metric_options[1:] if not forecast_df[col].isna().all()
+            ]
+            metric_data = forecast_df[valid_columns].copy()
+
+            # Ensure the date column is a datetime type
+            metric_data["date"] = pd.to_datetime(metric_data["date"])
+
+            if not metric_data.empty:
+                # Melt the data for easier plotting with Altair
+                metric_data = metric_data.melt(id_vars=["date"], var_name="Model", value_name="Crime Count")
+                # Forecast models only cover the last few months, so most melted rows are empty;
+                # drop them here rather than shipping them to the browser
+                metric_data = metric_data.dropna(subset=["Crime Count"])
+
+                # Calculate the y-axis maximum value (10x the max of actual_crime_count)
+                y_max = metric_data[metric_data["Model"] == "actual_crime_count"]["Crime Count"].max() * 1.3
+                if pd.isna(y_max) or y_max == 0:
+                    y_max = 1  # Set a default value if y_max is invalid
+
+
+                # Create Altair chart
+                chart = alt.Chart(metric_data).mark_line(point=True).encode(
+                    x=alt.X("date:T", title="Date"),
+                    y=alt.Y(
+                        "Crime Count:Q",
+                        title="Crime Count"
+                        , scale=alt.Scale(domain=[-50, y_max], clamp=True)  # Set y-axis range
+                    ),
+                    color=alt.Color("Model:N", title="Model"),  # Dynamically assign colors to each model
+                    tooltip=["date:T", "Model:N", "Crime Count:Q"]
+                ).properties(title="Actual and Forecasted Crime Counts")
+
+                st.altair_chart(chart, width='stretch')
+            else:
+                st.warning("No data available after filtering. Check your data for values > 0.")
         else:
-            st.warning("No data available after filtering. Check your data for values > 0.")
-    else:
-        st.warning("No forecast data available.")
+            st.warning("No forecast data available.")
 # ----------------------------
 DASHBOARD_VERSION = "v1.0.0"
 # Sidebar enhancements